@@ -0,0 +1,85 @@
+"""
+Benchmark the /pii entity layouts on an entity-dense document, one factor at a time:
+detection (incl. building the wire layout), encoding (layout x encoder) and the whole
+/pii/analyse path. "fastapi-default" is the pre-EntityBatch route:
+dicts -> jsonable_encoder -> json.dumps.
+
+    cd services/api
+    python bench_entities.py -n 10000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from core.ner import detect_entities
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None
+try:
+    from fastapi.encoders import jsonable_encoder
+except Exception:
+    jsonable_encoder = None
+
+LINE = "Tan Wei Ming S1234567A tan@example.com +65 9123 4567 lives at 12 Orchard Road. "
+
+
+def main():
+    p = argparse.ArgumentParser(description="Entity layout benchmark")
+    p.add_argument("-n", type=int, default=10_000, help="Approximate number of entities")
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+
+    text = LINE * max(1, args.n // len(detect_entities(LINE)))
+
+    def peak(fn):
+        tracemalloc.start()
+        fn()
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return top / 1024
+
+    def timed(fn):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        return (time.perf_counter() - t0) / args.repeat * 1000
+
+    encoders = {"json": lambda o: json.dumps(o, separators=(",", ":")).encode()}
+    if jsonable_encoder is not None:
+        encoders["fastapi-default"] = lambda o: json.dumps(jsonable_encoder(o)).encode()
+    if orjson is not None:
+        encoders["orjson"] = orjson.dumps
+    if msgpack is not None:
+        encoders["msgpack"] = lambda o: msgpack.packb(o, use_bin_type=True)
+
+    build = {
+        "objects": lambda: detect_entities(text).to_dicts(),
+        "batch only": lambda: detect_entities(text),
+        "columnar": lambda: detect_entities(text).to_columnar(),
+    }
+    payloads = {"objects": {"entities": build["objects"]()}, "columnar": {"entities": build["columnar"]()}}
+
+    print(f"entities: {len(detect_entities(text))}  text: {len(text) / 1024:.0f} KiB")
+    print("detect (ms, peak KiB)")
+    for name, fn in build.items():
+        print(f"  {name:<16}{timed(fn):8.2f}{peak(fn):10.1f}")
+    print("encode (ms, KiB)")
+    for layout, payload in payloads.items():
+        for enc, dumps in encoders.items():
+            print(f"  {layout:<9}{enc:<16}{timed(lambda: dumps(payload)):8.2f}{len(dumps(payload)) / 1024:10.1f}")
+    print("/pii/analyse path (ms)")
+    for layout in payloads:
+        for enc, dumps in encoders.items():
+            print(f"  {layout:<9}{enc:<16}{timed(lambda: dumps({'entities': build[layout]()})):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Compact container for detected entities. Instead of one dict per match we keep
+# parallel arrays (type id / start / end / confidence) plus a small per-batch type
+# table, which uses less memory and encodes smaller on entity-dense input.
+#
+# Two wire layouts are supported:
+#   "objects"  -> [{"type", "start", "end", "valueHash", "confidence"}, ...]  (legacy)
+#   "columnar" -> {"typeNames": [...], "typeIds": [...], "start": [...], "end": [...],
+#                  "valueHash": [...], "confidence": [...]}
+
+_COLUMNAR_KEYS = ("typeNames", "typeIds", "start", "end", "valueHash", "confidence")
+
+
+class EntityBatch:
+    __slots__ = ("type_names", "_type_index", "type_ids", "starts", "ends", "hashes", "confidences")
+
+    def __init__(self) -> None:
+        self.type_names: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self.type_ids = array("H")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.hashes: List[str] = []
+        self.confidences = array("d")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        names = self.type_names
+        for t, s, e in zip(self.type_ids, self.starts, self.ends):
+            yield names[t], s, e
+
+    def _type_id(self, typ: str) -> int:
+        tid = self._type_index.get(typ)
+        if tid is None:
+            tid = self._type_index[typ] = len(self.type_names)
+            self.type_names.append(typ)
+        return tid
+
+    def append(self, typ: str, start: int, end: int, value_hash: str = "", confidence: float = 0.0) -> None:
+        self.type_ids.append(self._type_id(typ))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.hashes.append(value_hash)
+        self.confidences.append(confidence)
+
+    def extend(self, typ: str, starts: List[int], ends: List[int], hashes: List[str], confidence: float) -> None:
+        """Bulk append for one entity type; much cheaper than per-entity append()."""
+        n = len(starts)
+        self.type_ids.extend([self._type_id(typ)] * n)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.hashes.extend(hashes)
+        self.confidences.extend([confidence] * n)
+
+    def validate_spans(self, text_len: int) -> Optional[str]:
+        """Return the type of the first entity with an out-of-range span, or None."""
+        for t, s, e in zip(self.type_ids, self.starts, self.ends):
+            if not (0 <= s < e <= text_len):
+                return self.type_names[t]
+        return None
+
+    # ---- Wire formats ----------------------------------------------------------
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        names = self.type_names
+        return [
+            {"type": names[t], "start": s, "end": e, "valueHash": h, "confidence": c}
+            for t, s, e, h, c in zip(self.type_ids, self.starts, self.ends, self.hashes, self.confidences)
+        ]
+
+    def to_columnar(self) -> Dict[str, Any]:
+        return {
+            "typeNames": list(self.type_names),
+            "typeIds": self.type_ids.tolist(),
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "valueHash": list(self.hashes),
+            "confidence": self.confidences.tolist(),
+        }
+
+    def to_wire(self, layout: str = "objects"):
+        return self.to_columnar() if layout == "columnar" else self.to_dicts()
+
+    def with_values(self, text: str) -> List[Dict[str, Any]]:
+        """Dicts carrying the matched text, as expected by ner_llm's merge helpers."""
+        return [{"type": typ, "value": text[s:e], "start": s, "end": e} for typ, s, e in self]
+
+    @classmethod
+    def from_dicts(cls, ents: Iterable[Dict[str, Any]]) -> "EntityBatch":
+        batch = cls()
+        for e in ents:
+            try:
+                typ, value_hash = e["type"], e.get("valueHash", "")
+                if not isinstance(typ, str) or not isinstance(value_hash, str):
+                    raise TypeError("type and valueHash must be strings")
+                batch.append(typ, e["start"], e["end"], value_hash, e.get("confidence", 0.0))
+            except (KeyError, TypeError, AttributeError, OverflowError) as err:
+                raise ValueError(f"Malformed entity: {e!r}") from err
+        return batch
+
+    @classmethod
+    def from_columnar(cls, cols: Dict[str, Any]) -> "EntityBatch":
+        batch = cls()
+        try:
+            cols = {key: cols[key] for key in _COLUMNAR_KEYS}
+        except KeyError as err:
+            raise ValueError(f"Missing columnar field {err}") from err
+        for key, val in cols.items():
+            if not isinstance(val, list):
+                raise ValueError(f"Columnar field {key!r} must be a list")
+        try:
+            batch.type_ids = array("H", cols["typeIds"])
+            batch.starts = array("i", cols["start"])
+            batch.ends = array("i", cols["end"])
+            batch.confidences = array("d", cols["confidence"])
+        except (TypeError, OverflowError) as err:
+            raise ValueError("Malformed columnar entities") from err
+        names, batch.hashes = list(cols["typeNames"]), list(cols["valueHash"])
+        if not all(isinstance(v, str) for v in names) or not all(isinstance(v, str) for v in batch.hashes):
+            raise ValueError("Columnar typeNames and valueHash must be strings")
+        n = len(batch.starts)
+        if any(len(col) != n for col in (batch.type_ids, batch.ends, batch.hashes, batch.confidences)):
+            raise ValueError("Columnar entity arrays differ in length")
+        if any(t >= len(names) for t in batch.type_ids):
+            raise ValueError("Unknown type id in columnar entities")
+        batch.type_names = names
+        batch._type_index = {name: i for i, name in enumerate(names)}
+        return batch
+
+    @classmethod
+    def from_wire(cls, payload: Any) -> "EntityBatch":
+        """Accept either wire layout (or an existing batch)."""
+        if isinstance(payload, cls):
+            return payload
+        if isinstance(payload, dict):
+            return cls.from_columnar(payload)
+        if isinstance(payload, list):
+            return cls.from_dicts(payload)
+        raise ValueError("entities must be a list of objects or a columnar object")
@@ -2,6 +2,8 @@ import os
 import re
 import hashlib
 
+from core.entities import EntityBatch
+
 # --- LLM hybrid integration (optional) -----------------------------------------
 # Set USE_LLM_NER=1 to enable LLM extraction and merge with regex results.
 # Requires ner_llm.py and OPENAI_API_KEY.
@@ -29,41 +31,39 @@ PATTERNS = {
 def _hash(val: str) -> str:
     return hashlib.sha256(val.encode("utf-8")).hexdigest()[:8]
 
-def detect_entities(text: str):
+def _use_llm() -> bool:
+    return os.getenv("USE_LLM_NER") in ("1", "true", "True") and llm_then_regex_fallback is not None
+
+def _llm_rows(text: str, regex_entities):
+    """Merge regex hits with LLM extractions; (type, start, end, valueHash, confidence) rows or None."""
+    try:
+        merged = llm_then_regex_fallback(text, regex_entities, prefer_llm=True)
+        rows = []
+        for m in merged:
+            s, e = m.get("start"), m.get("end")
+            val = m.get("value") if s is None or e is None else text[s:e]
+            start = s if s is not None else text.find(val)
+            # Unlocated values keep start=-1 so /pii/tokenise rejects their span.
+            end = e if e is not None else (text.find(val) + len(val) if val else start)
+            rows.append((m.get("type"), start, end, _hash(val or ""), 0.85))
+        return rows
+    except Exception:
+        return None
+
+def detect_entities(text: str) -> EntityBatch:
     
-    final = []
+    final = EntityBatch()
     for typ, pat in PATTERNS.items():
-        for m in pat.finditer(text):
-            final.append({
-                "type": typ,
-                "start": m.start(),
-                "end": m.end(),
-                "valueHash": _hash(m.group(0)),
-                "confidence": 0.9,
-            })
+        ms = list(pat.finditer(text))
+        final.extend(typ, [m.start() for m in ms], [m.end() for m in ms], [_hash(m.group(0)) for m in ms], 0.9)
 
     # Optional LLM hybrid:
-    use_llm = os.getenv("USE_LLM_NER") in ("1", "true", "True")
-    if use_llm and llm_then_regex_fallback is not None:
-        regex_entities = [
-            {"type": e["type"], "value": text[e["start"]:e["end"]], "start": e["start"], "end": e["end"]}
-            for e in final
-        ]
-        try:
-            merged = llm_then_regex_fallback(text, regex_entities, prefer_llm=True)
-            out = []
-            for m in merged:
-                s, e = m.get("start"), m.get("end")
-                val = m.get("value") if s is None or e is None else text[s:e]
-                out.append({
-                    "type": m.get("type"),
-                    "start": s if s is not None else text.find(val),
-                    "end": e if e is not None else (text.find(val) + len(val) if val else None),
-                    "valueHash": _hash(val or ""),
-                    "confidence": 0.85
-                })
+    if _use_llm():
+        rows = _llm_rows(text, final)
+        if rows is not None:
+            out = EntityBatch()
+            for r in rows:
+                out.append(*r)
             return out
-        except Exception:
-            pass
 
-    return final
\ No newline at end of file
+    return final
@@ -3,7 +3,12 @@ import os
 import json
 import re
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+
+try:
+    from core.entities import EntityBatch
+except ImportError:  # running this file directly as a script
+    from entities import EntityBatch  # type: ignore
 
 # If you already have an OpenAI client wrapper, you can replace this import and client creation.
 try:
@@ -122,15 +127,18 @@ def extract_entities(
 
 def llm_then_regex_fallback(
     text: str,
-    regex_entities: List[Dict[str, Any]],
+    regex_entities: Union[EntityBatch, List[Dict[str, Any]]],
     prefer_llm: bool = True,
 ) -> List[Dict[str, Any]]:
     """
     Merge LLM results with your existing regex NER.
+    - regex_entities may be an EntityBatch (values are sliced from text) or dicts.
     - If prefer_llm=True, LLM extractions override duplicates from regex by span.
     - Otherwise regex wins.
     Duplicates are de-duped by (type, value, start, end).
     """
+    if isinstance(regex_entities, EntityBatch):
+        regex_entities = regex_entities.with_values(text)
     try:
         llm_entities = extract_entities(text)
     except Exception:
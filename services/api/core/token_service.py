@@ -1,14 +1,18 @@
 import os, hmac, hashlib
+from core.entities import EntityBatch
 SALT = (os.getenv("TOKEN_SALT") or "change-me-32chars-minimum").encode()
 PREFIX = {"PERSON_NAME":"SUBJ","NRIC":"ID","ACCOUNT_NUMBER":"ACC","EMAIL":"EML","PHONE":"TEL","DOB":"DOB"}
-def tokenise(text: str, entities: list[dict]):
-    ents = sorted(entities, key=lambda e: e["start"])
+def tokenise(text: str, entities: "EntityBatch | list[dict]"):
+    batch = EntityBatch.from_wire(entities)
+    names, starts, ends = batch.type_names, batch.starts, batch.ends
+    order = sorted(range(len(batch)), key=starts.__getitem__)
     out, i = [], 0
-    for e in ents:
-        out.append(text[i:e["start"]])
-        raw = text[e["start"]:e["end"]].encode()
+    for k in order:
+        s, e = starts[k], ends[k]
+        out.append(text[i:s])
+        raw = text[s:e].encode()
         digest = hmac.new(SALT, raw, hashlib.sha256).hexdigest()[:4].upper()
-        out.append(f"{PREFIX.get(e['type'],'TOK')}_{digest}")
-        i = e["end"]
+        out.append(f"{PREFIX.get(names[batch.type_ids[k]],'TOK')}_{digest}")
+        i = e
     out.append(text[i:])
     return "".join(out)
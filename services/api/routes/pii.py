@@ -1,8 +1,23 @@
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Any, Literal
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from core.entities import EntityBatch
 from core.ner import detect_entities
 from core.token_service import tokenise
 
+# Optional fast encoders; fall back to stdlib json when not installed.
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
 router = APIRouter()
 
 class AnalyseReq(BaseModel):
@@ -10,15 +25,52 @@ class AnalyseReq(BaseModel):
 
 class TokeniseReq(BaseModel):
     text: str
-    entities: list[dict]
+    # list[dict] ("objects") or a columnar object; left untyped so pydantic does not
+    # walk every entity - EntityBatch.from_wire does the parsing.
+    entities: Any
+
+def _wants_msgpack(accept: str) -> bool:
+    """True if msgpack is acceptable (q > 0) and ranked at least as high as JSON."""
+    q_msgpack, q_json = 0.0, 0.0
+    for part in accept.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media = media.lower()
+        if media == MSGPACK_MEDIA_TYPE:
+            q_msgpack = max(q_msgpack, q)
+        elif media in ("application/json", "application/*", "*/*"):
+            q_json = max(q_json, q)
+    return q_msgpack > 0 and q_msgpack >= q_json
+
+def _encode(payload: dict, request: Request) -> Response:
+    if msgpack is not None and _wants_msgpack(request.headers.get("accept", "")):
+        return Response(msgpack.packb(payload, use_bin_type=True), media_type=MSGPACK_MEDIA_TYPE)
+    if orjson is not None:
+        return Response(orjson.dumps(payload), media_type="application/json")
+    return Response(json.dumps(payload, separators=(",", ":")), media_type="application/json")
 
 @router.post("/analyse")
-def analyse(req: AnalyseReq):
-    return {"entities": detect_entities(req.text)}
+def analyse(
+    req: AnalyseReq,
+    request: Request,
+    layout: Literal["objects", "columnar"] = Query("objects", alias="format"),
+):
+    return _encode({"entities": detect_entities(req.text).to_wire(layout)}, request)
 
 @router.post("/tokenise")
-def tokenise_route(req: TokeniseReq):
-    for e in req.entities:
-        if not (0 <= e["start"] < e["end"] <= len(req.text)):
-            raise HTTPException(400, f"Invalid span for {e.get('type')}")
-    return {"tokenisedText": tokenise(req.text, req.entities), "tokenMapRef": "demo-map-id"}
\ No newline at end of file
+def tokenise_route(req: TokeniseReq, request: Request):
+    try:
+        batch = EntityBatch.from_wire(req.entities)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    bad = batch.validate_spans(len(req.text))
+    if bad is not None:
+        raise HTTPException(400, f"Invalid span for {bad}")
+    return _encode({"tokenisedText": tokenise(req.text, batch), "tokenMapRef": "demo-map-id"}, request)
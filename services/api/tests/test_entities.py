@@ -0,0 +1,69 @@
+import pytest
+
+from core.entities import EntityBatch
+from core.ner import detect_entities
+from core.token_service import tokenise
+
+TEXT = "John Tan, S1234567A, john@x.com +65 9123 4567 lives at 12 Orchard Road"
+
+
+def test_to_dicts_keeps_legacy_shape():
+    first = detect_entities(TEXT).to_dicts()[0]
+    assert first == {"type": "NRIC", "start": 10, "end": 19, "valueHash": first["valueHash"], "confidence": 0.9}
+    assert len(first["valueHash"]) == 8
+
+
+@pytest.mark.parametrize("layout", ["objects", "columnar"])
+def test_wire_round_trip(layout):
+    batch = detect_entities(TEXT)
+    again = EntityBatch.from_wire(batch.to_wire(layout))
+    assert again.to_dicts() == batch.to_dicts()
+    assert again.to_columnar() == batch.to_columnar()
+
+
+def test_from_wire_passes_batch_through():
+    batch = detect_entities(TEXT)
+    assert EntityBatch.from_wire(batch) is batch
+
+
+def test_tokenise_batch_matches_dicts():
+    batch = detect_entities(TEXT)
+    expected = tokenise(TEXT, batch.to_dicts())
+    assert tokenise(TEXT, batch) == expected
+    assert tokenise(TEXT, batch.to_columnar()) == expected
+    assert "S1234567A" not in expected
+
+
+def test_validate_spans():
+    batch = detect_entities(TEXT)
+    assert batch.validate_spans(len(TEXT)) is None
+    assert batch.validate_spans(5) == "NRIC"
+
+
+COLUMNAR = {"typeNames": ["NRIC"], "typeIds": [0], "start": [0], "end": [9], "valueHash": ["h"], "confidence": [0.9]}
+
+
+@pytest.mark.parametrize("payload", [
+    5,
+    "entities",
+    [{"type": "NRIC"}],
+    [{"type": "NRIC", "start": "0", "end": 9}],
+    [7],
+    [{"type": None, "start": 0, "end": 9}],
+    [{"type": "NRIC", "start": 0, "end": 9, "valueHash": None}],
+    {k: v for k, v in COLUMNAR.items() if k != "confidence"},
+    {**COLUMNAR, "confidence": ["x"]},
+    {**COLUMNAR, "confidence": [None]},
+    {**COLUMNAR, "confidence": 5},
+    {**COLUMNAR, "valueHash": "a"},
+    {**COLUMNAR, "typeNames": "AB"},
+    {**COLUMNAR, "typeNames": [None]},
+    {**COLUMNAR, "valueHash": [None]},
+    {**COLUMNAR, "start": [0.5]},
+    {**COLUMNAR, "typeIds": [-1]},
+    {**COLUMNAR, "typeIds": [1]},
+    {**COLUMNAR, "end": [9, 10]},
+])
+def test_from_wire_rejects_malformed(payload):
+    with pytest.raises(ValueError):
+        EntityBatch.from_wire(payload)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import routes.pii as pii
+from main import app
+
+client = TestClient(app)
+
+TEXT = "John Tan, S1234567A, john@x.com +65 9123 4567 lives at 12 Orchard Road"
+
+
+def _analyse(layout="objects", **kw):
+    return client.post(f"/pii/analyse?format={layout}", json={"text": TEXT}, **kw)
+
+
+def test_analyse_layouts():
+    objects = _analyse("objects").json()["entities"]
+    columnar = _analyse("columnar").json()["entities"]
+    assert [e["type"] for e in objects] == [columnar["typeNames"][t] for t in columnar["typeIds"]]
+    assert [e["start"] for e in objects] == columnar["start"]
+    assert _analyse("xml").status_code == 422
+
+
+@pytest.mark.parametrize("layout", ["objects", "columnar"])
+def test_tokenise_accepts_both_layouts(layout):
+    entities = _analyse(layout).json()["entities"]
+    r = client.post("/pii/tokenise", json={"text": TEXT, "entities": entities})
+    assert r.status_code == 200
+    assert r.json()["tokenisedText"].startswith("SUBJ_")
+
+
+def test_tokenise_requires_entities():
+    assert client.post("/pii/tokenise", json={"text": TEXT}).status_code == 422
+
+
+@pytest.mark.parametrize("entities", [
+    [{"type": "NRIC"}],
+    [{"type": "NRIC", "start": 0, "end": 999}],
+    {"typeNames": ["NRIC"], "typeIds": [0], "start": [0], "end": [9], "valueHash": ["h"], "confidence": ["x"]},
+    {"typeNames": "AB", "typeIds": [0], "start": [0], "end": [9], "valueHash": ["h"], "confidence": [0.9]},
+    "nope",
+])
+def test_tokenise_malformed_is_400(entities):
+    r = client.post("/pii/tokenise", json={"text": TEXT, "entities": entities})
+    assert r.status_code == 400
+
+
+def test_msgpack_on_request():
+    msgpack = pytest.importorskip("msgpack")
+    r = _analyse("columnar", headers={"Accept": pii.MSGPACK_MEDIA_TYPE})
+    assert r.headers["content-type"] == pii.MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(r.content) == _analyse("columnar").json()
+
+
+@pytest.mark.parametrize("accept, wants", [
+    ("application/x-msgpack", True),
+    ("application/json, application/x-msgpack;q=0", False),
+    ("application/x-msgpack;q=0.1, application/json", False),
+    ("application/json;q=0.5, application/x-msgpack", True),
+    ("*/*", False),
+    ("application/x-msgpack;q=oops", False),
+])
+def test_accept_q_values(accept, wants):
+    pytest.importorskip("msgpack")
+    r = _analyse(headers={"Accept": accept})
+    assert (r.headers["content-type"] == pii.MSGPACK_MEDIA_TYPE) is wants
+
+
+def test_json_fallbacks(monkeypatch):
+    expected = _analyse().json()
+    monkeypatch.setattr(pii, "msgpack", None)
+    r = _analyse(headers={"Accept": pii.MSGPACK_MEDIA_TYPE})
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == expected
+    monkeypatch.setattr(pii, "orjson", None)
+    r = _analyse()
+    assert r.headers["content-type"] == "application/json"
+    assert json.loads(r.content) == expected